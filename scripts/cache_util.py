@@ -4,16 +4,21 @@ Cache utility for Alfred Report LLM outputs
 
 Prevents re-running expensive LLM calls when source data hasn't changed.
 Uses hash-based invalidation per day.
+
+Also provides a small time-based (TTL) cache for raw API responses, kept
+outside the published report directory.
 """
 
 import json
 import hashlib
 import os
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 CACHE_DIR = Path("/home/alfred/repos/The-Alfred-Report/public/alfred-report/cache")
+TTL_CACHE_DIR = Path(os.path.expanduser("~/.cache/alfred"))
 
 def get_cache_path(section_name: str, date: str) -> Path:
     """Get cache file path for a section on a given date."""
@@ -23,7 +28,7 @@ def get_cache_path(section_name: str, date: str) -> Path:
 def hash_data(data: Any) -> str:
     """Create a deterministic hash of data."""
     data_str = json.dumps(data, sort_keys=True, default=str)
-    return hashlib.sha256(data_str.encode()).hexdigest()[:16]
+    return hashlib.blake2b(data_str.encode(), digest_size=8).hexdigest()
 
 def get_cached(section_name: str, date: str, source_data: Any) -> Optional[Dict]:
     """
@@ -86,3 +91,29 @@ def clear_old_cache(days_to_keep: int = 7) -> None:
                 cache_file.unlink()
             except Exception:
                 pass
+
+def get_cached_ttl(key: str) -> Optional[Any]:
+    """Return data saved under key by save_cache_ttl, or None if missing/expired."""
+    cache_path = TTL_CACHE_DIR / f"{key}.json"
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if time.time() > cached.get("expires_at", 0):
+        return None
+    return cached.get("data")
+
+def save_cache_ttl(key: str, data: Any, ttl_seconds: float) -> None:
+    """Save data under key for ttl_seconds (atomic write)."""
+    cache_path = TTL_CACHE_DIR / f"{key}.json"
+    tmp = cache_path.with_suffix(".tmp")
+    
+    try:
+        TTL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump({"expires_at": time.time() + ttl_seconds, "data": data}, f)
+        os.replace(tmp, cache_path)
+    except Exception as e:
+        print(f"Warning: failed to save TTL cache for {key}: {e}")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+HTTP keep-alive helper for The Alfred Report skills
+
+Keeps one persistent HTTPS connection per host (per thread) so repeated
+calls to the same API skip the TCP + TLS handshake after the first request.
+get_json adds retries with backoff so a transient blip doesn't drop a section,
+and wait_for_brave_slot paces Brave Search calls across all skills.
+"""
+
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple
+
+_local = threading.local()
+
+# Redirects request() follows for GET/HEAD before giving up
+MAX_REDIRECTS = 5
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_CROSS_HOST_HEADERS = ("user-agent", "accept", "accept-encoding")
+
+# Base delay before retrying a failed GET in get_json; doubles on each retry
+RETRY_BACKOFF_SECONDS = 0.25
+
+# Brave Search request rate shared by every skill and thread in the process
+# (free plan allows 1 request/second; excess requests get a 429)
+BRAVE_MAX_RPS = float(os.environ.get("BRAVE_MAX_RPS", "1"))
+_brave_rate_lock = threading.Lock()
+_brave_next_slot = 0.0
+
+# Errors that mean a pooled connection went stale between requests
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+def wait_for_brave_slot() -> None:
+    """Block until this thread may send the next Brave Search request."""
+    global _brave_next_slot
+    with _brave_rate_lock:
+        now = time.monotonic()
+        slot = max(now, _brave_next_slot)
+        _brave_next_slot = slot + 1.0 / BRAVE_MAX_RPS
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _get_connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    """Return this thread's pooled connection for host, creating it if needed."""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = {}
+
+    conn = pool.get(host)
+    if conn is None:
+        conn = pool[host] = http.client.HTTPSConnection(host, timeout=timeout)
+    else:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_connection(host: str) -> None:
+    """Close and forget this thread's pooled connection for host."""
+    conn = getattr(_local, "pool", {}).pop(host, None)
+    if conn is not None:
+        conn.close()
+
+
+def _send(
+    url: str,
+    method: str,
+    headers: Optional[Dict[str, str]],
+    body: Optional[bytes],
+    timeout: float,
+) -> Tuple[http.client.HTTPResponse, bytes]:
+    """Send one request over this thread's pooled connection; return (response, body)."""
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.netloc
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+
+    for attempt in range(2):
+        conn = _get_connection(host, timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            data = resp.read()
+        except _STALE_ERRORS:
+            _drop_connection(host)
+            # Only a pooled connection can have gone stale while idle; a
+            # failure on a fresh one is real, and resending could repeat a POST
+            if attempt or not reused:
+                raise
+            continue
+        except Exception:
+            _drop_connection(host)
+            raise
+
+        if resp.will_close:
+            _drop_connection(host)
+        return resp, data
+
+
+def request(
+    url: str,
+    method: str = "GET",
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[bytes] = None,
+    timeout: float = 15,
+) -> bytes:
+    """
+    Perform an HTTPS request over a reused connection and return the body.
+
+    GET/HEAD requests follow up to MAX_REDIRECTS redirects to other https
+    URLs. Any other 3xx, and every 4xx/5xx, raises urllib.error.HTTPError.
+    A pooled connection the server closed while idle is reopened once
+    transparently.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        resp, data = _send(url, method, headers, body, timeout)
+        location = resp.getheader("Location")
+        if resp.status in _REDIRECT_CODES and method in ("GET", "HEAD") and location:
+            target = urllib.parse.urljoin(url, location)
+            parsed = urllib.parse.urlsplit(target)
+            if parsed.scheme == "https":
+                if headers and parsed.netloc != urllib.parse.urlsplit(url).netloc:
+                    # Don't hand API keys/tokens to a different host
+                    headers = {k: v for k, v in headers.items() if k.lower() in _CROSS_HOST_HEADERS}
+                url = target
+                continue
+        if resp.status >= 300:
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        return data
+
+    raise urllib.error.HTTPError(url, resp.status, "Too many redirects", resp.headers, None)
+
+
+def get_json(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10,
+    retries: int = 3,
+) -> Any:
+    """
+    GET url and parse the JSON body, retrying transient failures.
+
+    5xx responses and network errors (timeouts, resets, DNS) are retried up to
+    `retries` times with exponential backoff (0.25s, 0.5s, 1s, ...); 4xx
+    responses are raised immediately since retrying won't change them.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return json.loads(request(url, headers=headers, timeout=timeout))
+        except urllib.error.HTTPError as e:
+            if e.code < 500 or attempt == retries:
+                raise
+        except OSError:
+            if attempt == retries:
+                raise
+        time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
@@ -4,6 +4,7 @@ import os
 import sys
 import urllib.request
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
 from pathlib import Path
 
@@ -26,6 +27,22 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 PUBLIC_DIR = REPO_ROOT / "public" / "alfred-report"
 DAILY_DIR = PUBLIC_DIR / "daily"
 
+# I/O-bound skills fetched in the background while the other sections build.
+# (section key, fetch function, title used if the fetch fails or times out)
+BACKGROUND_SKILLS = (
+    ("weather", get_weather, "Weather — Arlington, VA"),
+    ("todoist", get_todoist, "To Do List"),
+    ("youtube", get_youtube_updates, "Today's AI Daily Digest"),
+)
+BACKGROUND_TIMEOUT_SECONDS = 60
+
+# Order of sections in the published report JSON
+SECTION_ORDER = (
+    "weather", "todoist", "kanban", "ai_news", "youtube",
+    "ai_reddit_trending", "company_reddit_watch",
+    "portfolio_news", "watchlist_news", "company_news_links",
+)
+
 def now_iso_local():
     # Local time on the server is fine; your report JSON will carry this.
     return datetime.now().astimezone().isoformat(timespec="seconds")
@@ -71,6 +88,18 @@ def send_telegram_message(text: str):
     except Exception as e:
         print(f"[TELEGRAM] Failed to send: {e}")
 
+def _background_result(key: str, future, title: str) -> dict:
+    """Wait for a background skill; turn a timeout or crash into an error section."""
+    try:
+        return future.result(timeout=BACKGROUND_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        error = f"timed out after {BACKGROUND_TIMEOUT_SECONDS}s"
+    except Exception as e:
+        error = str(e)[:200]
+    print(f"[PUBLISH] {key} section failed: {error}")
+    return {"title": title, "summary": f"Unavailable: {error}", "items": [], "meta": {"error": error}}
+
+
 def _title_words(title: str) -> set:
     """Return a set of significant lowercase words from a title."""
     stopwords = {"the", "a", "an", "of", "in", "on", "at", "to", "for", "and", "or",
@@ -164,24 +193,21 @@ def main():
     # Initialize cost tracker
     init_tracker(report_date)
 
+    # Start the independent I/O-bound skills (weather, todoist, youtube) in
+    # background threads; their latency overlaps with the sections below
+    pool = ThreadPoolExecutor(max_workers=len(BACKGROUND_SKILLS))
+    background = {key: (pool.submit(fn), title) for key, fn, title in BACKGROUND_SKILLS}
+    pool.shutdown(wait=False)
+
     # Build sections
     sections = {}
     
-    # Weather section
-    sections["weather"] = get_weather()
-    
-    # Todoist section
-    sections["todoist"] = get_todoist()
-    
     # Kanban section
     sections["kanban"] = get_kanban()
     
     # AI News section
     sections["ai_news"] = get_ai_news()
     
-    # YouTube section
-    sections["youtube"] = get_youtube_updates()
-    
     # Reddit sections
     ai_reddit, company_reddit = get_reddit_sections()
     sections["ai_reddit_trending"] = ai_reddit
@@ -194,6 +220,11 @@ def main():
     # Links to Company News (simple hard-coded Google News links)
     sections["company_news_links"] = get_company_news_links()
 
+    # Weather, Todoist and YouTube sections (started above)
+    for key, (future, title) in background.items():
+        sections[key] = _background_result(key, future, title)
+    sections = {key: sections[key] for key in SECTION_ORDER}
+
     # ── Cross-section deduplication ──────────────────────────────────────────
     # Remove the same story from appearing in multiple sections.
     sections = cross_section_deduplicate(sections)
@@ -12,20 +12,23 @@ One cheap haiku call for summaries.
 
 import os
 import json
+import heapq
 import yaml
-import urllib.request
 import urllib.parse
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Tuple
 from collections import defaultdict
+from operator import attrgetter
 
 # Add scripts dir to path
 sys.path.insert(0, str(Path(__file__).parent))
 from cache_util import get_cached, save_cache, hash_data
 from cost_tracker import record as record_cost
+import http_util
 
 BRAVE_API_KEY = os.environ.get("BRAVE_API_KEY", "")
 ANTHROPIC_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
@@ -35,6 +38,9 @@ REPO_ROOT = "/home/alfred/repos/The-Alfred-Report"
 CONFIG_AI_SOURCES = f"{REPO_ROOT}/config/reddit_ai_sources.yaml"
 CONFIG_COMPANY_WATCH = f"{REPO_ROOT}/config/reddit_company_watch.yaml"
 
+# Leading/trailing markdown code fence around an LLM JSON reply
+_FENCE_RE = re.compile(r'^```(?:json)?\n|\n```$')
+
 # ── Brave Search ──────────────────────────────────────────────────────────────
 
 def brave_search(query: str, count: int = 10) -> List[Dict]:
@@ -53,15 +59,25 @@ def brave_search(query: str, count: int = 10) -> List[Dict]:
     }
 
     try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=15) as r:
-            data = json.loads(r.read())
+        # Both Reddit sections search concurrently; share the Brave rate limit
+        http_util.wait_for_brave_slot()
+        data = json.loads(http_util.request(url, headers=headers, timeout=15))
         return data.get("web", {}).get("results", [])
     except Exception:
         return []
 
 # ── AI Reddit Trending ─────────────────────────────────────────────────────────
 
+class Candidate(NamedTuple):
+    """A ranked-post candidate; a tuple is far lighter than a 7-key dict."""
+    title: str
+    url: str
+    subreddit: str
+    matched_terms: Tuple[str, ...]
+    weight: float
+    snippet: str
+    score: float
+
 def get_ai_reddit_trending() -> Dict:
     """Fetch top AI posts from configured subreddits via Brave Search."""
     
@@ -77,6 +93,7 @@ def get_ai_reddit_trending() -> Dict:
         }
 
     ai_sources = config.get("ai_daily_sources", [])
+    brave_count = config.get("brave_count", 12)
     enabled_sources = [s for s in ai_sources if s.get("enabled", True)]
 
     candidates = []
@@ -89,7 +106,7 @@ def get_ai_reddit_trending() -> Dict:
         weight = source.get("weight", 1.0)
 
         query = f"site:reddit.com/r/{subreddit} (AI OR LLM OR 'machine learning' OR model OR inference OR training)"
-        results = brave_search(query, count=20)  # Request more to account for filtering
+        results = brave_search(query, count=brave_count)
 
         for r in results:
             url = r.get("url", "")
@@ -104,40 +121,35 @@ def get_ai_reddit_trending() -> Dict:
             if not matched:
                 continue
 
-            candidates.append({
-                "title": title,
-                "url": url,
-                "subreddit": subreddit,
-                "source": "reddit",
-                "matched_terms": matched,
-                "weight": weight,
-                "snippet": r.get("description", ""),
-            })
+            candidates.append(Candidate(
+                title=title,
+                url=url,
+                subreddit=subreddit,
+                matched_terms=tuple(matched),
+                weight=weight,
+                snippet=r.get("description", ""),
+                # Subreddit weight + keyword matches
+                score=weight * 10 + len(matched) * 2,
+            ))
 
     # Deduplicate by URL
     seen_urls = set()
     deduplicated = []
     for c in candidates:
-        if c["url"] not in seen_urls:
-            seen_urls.add(c["url"])
+        if c.url not in seen_urls:
+            seen_urls.add(c.url)
             deduplicated.append(c)
 
-    # Score and rank
-    def score(c):
-        score = 0.0
-        score += c["weight"] * 10  # Subreddit weight
-        score += len(c["matched_terms"]) * 2  # Keyword matches
-        return score
-
-    ranked = sorted(deduplicated, key=score, reverse=True)[:15]
+    # Rank by precomputed score
+    ranked = heapq.nlargest(15, deduplicated, key=attrgetter("score"))
 
     items = [
         {
-            "title": r["title"],
-            "url": r["url"],
-            "subreddit": r["subreddit"],
-            "source": r["source"],
-            "matched_terms": r["matched_terms"],
+            "title": r.title,
+            "url": r.url,
+            "subreddit": r.subreddit,
+            "source": "reddit",
+            "matched_terms": list(r.matched_terms),
         }
         for r in ranked
     ]
@@ -174,6 +186,7 @@ def get_company_reddit_watch() -> Dict:
 
     companies = config.get("companies", [])
     enabled_companies = [c for c in companies if c.get("enabled", True)]
+    brave_count = config.get("brave_count", 15)
 
     results = {
         "title": "Company Reddit Watch",
@@ -198,13 +211,20 @@ def get_company_reddit_watch() -> Dict:
         topics = company.get("topics", [])
         scopes = company.get("subreddit_scopes", ["technology", "stocks", "investing"])
 
-        # Build search query
+        # Canonical name first: it is the most common match on Reddit posts
         terms = [name] + aliases
+
+        # Lowercased match terms, built once per company rather than per result
+        match_terms = tuple((t, t.lower()) for t in terms)
+        keywords_lower = tuple(kw.lower() for kw in keywords)
+        ticker_lower = ticker.lower() if ticker else None
+
+        # Build search query
         query_terms = " OR ".join(f'"{t}"' for t in terms)
         scope_query = " OR ".join(f"site:reddit.com/r/{s}" for s in scopes)
 
         query = f"({scope_query}) ({query_terms})"
-        search_results = brave_search(query, count=15)
+        search_results = brave_search(query, count=brave_count)
 
         company_items = []
         for sr in search_results:
@@ -216,30 +236,28 @@ def get_company_reddit_watch() -> Dict:
             if "reddit.com/r/" not in url or "/comments/" not in url:
                 continue
 
-            # Match company/aliases
+            # Match company/aliases; two matches already mean "high"
+            # confidence, so stop scanning there
             full_text = (title + " " + snippet).lower()
             matched_terms = []
-            for term in aliases + [name]:
-                if term.lower() in full_text:
+            for term, term_lower in match_terms:
+                if term_lower in full_text:
                     matched_terms.append(term)
+                    if len(matched_terms) == 2:
+                        break
+            has_keyword = any(kw in full_text for kw in keywords_lower)
 
-            if not matched_terms and ticker:
+            if not matched_terms and ticker_lower:
                 # Check ticker with confirming keyword
-                if ticker.lower() in full_text:
-                    confirming = [kw for kw in keywords if kw.lower() in full_text]
-                    if confirming:
-                        matched_terms.append(ticker)
+                if ticker_lower in full_text and has_keyword:
+                    matched_terms.append(ticker)
 
             if not matched_terms:
                 continue
 
-            # Deterministic topic tagging
-            matched_topics = []
+            # Deterministic topic tagging (keywords are shared by all topics)
+            matched_topics = list(topics) if has_keyword else []
             topic_confidence = "low"
-            for topic in topics:
-                # Check if any keyword for this topic appears
-                if any(kw.lower() in full_text for kw in keywords):
-                    matched_topics.append(topic)
             
             if matched_terms:
                 topic_confidence = "high" if len(matched_terms) > 1 else "medium"
@@ -298,13 +316,11 @@ def add_summaries(ai_trending: Dict, company_watch: Dict) -> tuple:
     # Check cache first
     today = datetime.now(timezone.utc).date().isoformat()
     
-    ai_urls = sorted([item["url"] for item in ai_trending.get("items", [])])
-    company_urls = sorted([item["url"] for c in company_watch.get("companies", []) for item in c.get("items", [])])
+    ai_urls = sorted(item["url"] for item in ai_trending.get("items", []))
+    company_urls = sorted(item["url"] for c in company_watch.get("companies", []) for item in c.get("items", []))
     
-    source_data = {
-        "ai_urls": ai_urls,
-        "company_urls": company_urls
-    }
+    # Flat URL signature (blank line separates the sections) for the cache key
+    source_data = "\n".join(ai_urls) + "\n\n" + "\n".join(company_urls)
     
     print(f"[REDDIT] AI Reddit has {len(ai_urls)} URLs, Company Watch has {len(company_urls)} URLs")
     
@@ -334,19 +350,19 @@ Return ONLY the JSON object. No markdown."""
 
     try:
         print(f"[REDDIT] Making Anthropic API call for summaries")
-        req = urllib.request.Request(
+        raw = http_util.request(
             "https://api.anthropic.com/v1/messages",
-            data=body,
+            method="POST",
             headers={
                 "x-api-key":         ANTHROPIC_KEY,
                 "anthropic-version": "2023-06-01",
                 "content-type":      "application/json",
                 "accept-encoding":   "identity",
             },
-            method="POST"
+            body=body,
+            timeout=20,
         )
-        with urllib.request.urlopen(req, timeout=20) as r:
-            resp = json.loads(r.read())
+        resp = json.loads(raw)
         
         # Record token usage
         usage = resp.get("usage", {})
@@ -354,12 +370,11 @@ Return ONLY the JSON object. No markdown."""
         output_tokens = usage.get("output_tokens", 0)
         record_cost("reddit", input_tokens, output_tokens, cache_hit=False)
         
-        raw_text = resp["content"][0]["text"]
+        raw_text = resp["content"][0]["text"].strip()
         
-        # Strip markdown code blocks if present
+        # Strip markdown code blocks if present (one pass, skipped for clean JSON)
         if raw_text.startswith("```"):
-            raw_text = re.sub(r'^```json?\n', '', raw_text)
-            raw_text = re.sub(r'\n```$', '', raw_text)
+            raw_text = _FENCE_RE.sub('', raw_text)
         
         summaries = json.loads(raw_text)
         
@@ -378,8 +393,14 @@ Return ONLY the JSON object. No markdown."""
 
 def get_reddit_sections() -> tuple:
     """Return both (ai_trending, company_watch) sections."""
-    ai_trending = get_ai_reddit_trending()
-    company_watch = get_company_reddit_watch()
+    # Both sections are pure Brave Search I/O and independent of each other,
+    # so fetch them concurrently. The summary prompt needs the final counts
+    # from both, so the LLM call still runs once they are done.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        ai_future = pool.submit(get_ai_reddit_trending)
+        company_future = pool.submit(get_company_reddit_watch)
+        ai_trending = ai_future.result()
+        company_watch = company_future.result()
     
     # Add LLM summaries (one cheap call for both)
     ai_trending, company_watch = add_summaries(ai_trending, company_watch)
@@ -17,21 +17,36 @@ import os
 import re
 import sys
 import math
+import functools
 import yaml
-import urllib.request
 import urllib.parse
+from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Set
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Add scripts dir to path
 sys.path.insert(0, str(Path(__file__).parent))
-from cache_util import get_cached, save_cache, hash_data
+from cache_util import get_cached, save_cache, hash_data, get_cached_ttl, save_cache_ttl
 from cost_tracker import record as record_cost
+import http_util
+
+try:
+    import orjson  # optional: faster state file load/save
+except ImportError:
+    orjson = None
 
 BRAVE_API_KEY = os.environ.get("BRAVE_API_KEY", "")
 
+# Number of Brave queries kept in flight while waiting on the network
+# (request rate is capped by http_util.BRAVE_MAX_RPS)
+BRAVE_WORKERS = 4
+
+# Reuse Brave responses across reruns within one report window
+BRAVE_CACHE_TTL_SECONDS = 900
+
 # Repo paths
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CONFIG_DIR = REPO_ROOT / "config"
@@ -58,6 +73,75 @@ DOMAIN_TO_SOURCE = {
     "news.google.com": "google",
 }
 
+# Host prefixes that serve the same site as the bare domain
+SOURCE_HOST_PREFIXES = ("www.", "m.", "amp.")
+
+# Path suffixes that are alternate renderings of the same article
+CANONICAL_PATH_SUFFIXES = ("/amp", "/index.html")
+
+# Keyword patterns for each event type (order matters: first tag is primary)
+EVENT_TAG_KEYWORDS = {
+    "guidance": ["raises guidance", "cuts outlook", "lowers guidance", "raises outlook", "guidance"],
+    "sec_filing": ["8-k", "10-k", "10-q", "sec filing", "files with sec", "sec charges"],
+    "earnings": ["earnings", "beats estimates", "misses estimates", "eps", "revenue"],
+    "m_and_a_confirmed": ["acquires", "merger completed", "deal closed", "to acquire", "acquisition"],
+    "m_and_a_rumor": ["in talks", "considering sale", "exploring options", "potential deal"],
+    "regulatory_action": ["doj", "ftc", "export controls", "antitrust", "fine", "settlement with regulators"],
+    "probe_or_investigation": ["under investigation", "probe", "investigation launched", "subpoena"],
+    "lawsuit": ["lawsuit", "sued", "class action", "settlement"],
+    "contract_win": ["wins contract", "secures deal", "awarded contract", "partnership with"],
+    "product_launch_major": ["launches", "new product", "unveils"],
+    "analyst_change_major": ["upgraded", "downgraded", "price target raised", "price target cut", "initiates coverage"],
+    "analyst_reiterate": ["reiterates", "maintains rating", "maintains buy", "maintains hold"],
+    "macro": ["fed", "interest rate", "inflation", "gdp", "unemployment", "fomc"],
+}
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Build a regex matching any of words, factored as a prefix trie.
+
+    Shared prefixes are tried once per text position instead of once per
+    word, and optional tails are greedy, so the longest word starting at a
+    position wins.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+# Single-pass keyword matcher: one trie regex over every tag keyword,
+# wrapped in a zero-width lookahead so the longest keyword starting at
+# *every* position is reported, including keywords that overlap an earlier
+# hit ("potential deal closed" yields both "potential deal" and "deal
+# closed"). Each keyword maps to the tags of every keyword it contains
+# (e.g. "settlement with regulators" also implies "settlement"), which
+# covers shorter keywords starting inside a longer match.
+_TAG_KEYWORDS = sorted({kw for keywords in EVENT_TAG_KEYWORDS.values() for kw in keywords})
+_TAG_KEYWORD_RE = re.compile(f"(?=({_trie_pattern(_TAG_KEYWORDS)}))")
+_TAGS_BY_KEYWORD = {
+    kw: frozenset(
+        tag for tag, keywords in EVENT_TAG_KEYWORDS.items()
+        if any(other in kw for other in keywords)
+    )
+    for kw in _TAG_KEYWORDS
+}
+
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+_DIGIT_RE = re.compile(r'(\d+)')
+
 
 def load_config() -> Tuple[Dict, Dict]:
     """Load ticker list and ranker config from YAML."""
@@ -78,47 +162,65 @@ def load_seen_state() -> Dict:
     if not STATE_FILE.exists():
         return {}
     try:
-        with open(STATE_FILE) as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        raw = STATE_FILE.read_bytes()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except (ValueError, IOError):
         return {}
 
 
+def seen_url_index(seen_state: Dict) -> Set[str]:
+    """Flatten the per-date 'seen URLs' state into one membership set."""
+    seen_urls = set()
+    for date_data in seen_state.values():
+        if isinstance(date_data, dict):
+            seen_urls.update(date_data.get("urls", []))
+    return seen_urls
+
+
 def save_seen_state(state: Dict):
     """Save the 'seen URLs' state file."""
     STATE_DIR.mkdir(parents=True, exist_ok=True)
     tmp = STATE_FILE.with_suffix(".tmp")
-    with open(tmp, "w") as f:
-        json.dump(state, f, indent=2)
+    if orjson:
+        tmp.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2)
     tmp.replace(STATE_FILE)
 
 
+@functools.lru_cache(maxsize=2048)
 def map_domain_to_source(url: str) -> str:
     """Map a URL to a source key from config."""
     try:
-        from urllib.parse import urlparse
         parsed = urlparse(url)
-        hostname = parsed.hostname or ""
-        hostname = hostname.lower().lstrip("www.")
+        hostname = (parsed.hostname or "").lower()
+        for prefix in SOURCE_HOST_PREFIXES:
+            if hostname.startswith(prefix):
+                hostname = hostname[len(prefix):]
+                break
         return DOMAIN_TO_SOURCE.get(hostname, "unknown")
     except Exception:
         return "unknown"
 
 
-def canonicalize_url(url: str, strip_params: List[str]) -> str:
+@functools.lru_cache(maxsize=8192)
+def canonicalize_url(url: str, strip_params: Tuple[str, ...]) -> str:
     """Create a canonical URL for deduplication/freshness checks."""
     try:
-        from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
         parsed = urlparse(url)
-        hostname = (parsed.hostname or "").lower()
+        hostname = (parsed.hostname or "").lower()  # also drops any port
         path = parsed.path.rstrip("/") if parsed.path else ""
+        for suffix in CANONICAL_PATH_SUFFIXES:
+            if path.endswith(suffix):
+                path = path[:-len(suffix)].rstrip("/")
         
-        # Strip query params
+        # Strip query params; sort the rest so parameter order doesn't matter
         if parsed.query:
             qs = parse_qs(parsed.query)
             for param in strip_params:
                 qs.pop(param, None)
-            query = urlencode(qs, doseq=True)
+            query = urlencode(sorted((k, v) for k, vs in qs.items() for v in vs))
         else:
             query = ""
         
@@ -134,20 +236,25 @@ def fetch_brave_news(query: str, count: int = 10) -> List[Dict]:
         print(f"[STOCK_NEWS] BRAVE_API_KEY not set, skipping query: {query}")
         return []
     
+    cache_key = f"brave_news_{hash_data([query, count])}"
+    cached = get_cached_ttl(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
+        http_util.wait_for_brave_slot()
         encoded_query = urllib.parse.quote(query)
         url = f"https://api.search.brave.com/res/v1/news/search?q={encoded_query}&count={count}&freshness=day"
         
-        req = urllib.request.Request(
+        raw = http_util.request(
             url,
             headers={
                 "Accept": "application/json",
                 "X-Subscription-Token": BRAVE_API_KEY
-            }
+            },
+            timeout=15,
         )
-        
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
+        data = json.loads(raw)
         
         results = []
         for item in data.get("results", []):
@@ -158,6 +265,7 @@ def fetch_brave_news(query: str, count: int = 10) -> List[Dict]:
                 "published": item.get("age", ""),  # Brave returns age string
             })
         
+        save_cache_ttl(cache_key, results, BRAVE_CACHE_TTL_SECONDS)
         return results
     except Exception as e:
         print(f"[STOCK_NEWS] Brave Search failed for '{query}': {e}")
@@ -172,22 +280,17 @@ def parse_brave_age(age_str: str) -> datetime:
     
     age_str = age_str.lower().strip()
     try:
+        m = _DIGIT_RE.search(age_str)
+        if not m:
+            return now
         if "minute" in age_str or "min" in age_str:
-            m = re.search(r'(\d+)', age_str)
-            if m:
-                return now - timedelta(minutes=int(m.group(1)))
+            return now - timedelta(minutes=int(m.group(1)))
         elif "hour" in age_str or "hr" in age_str:
-            m = re.search(r'(\d+)', age_str)
-            if m:
-                return now - timedelta(hours=int(m.group(1)))
+            return now - timedelta(hours=int(m.group(1)))
         elif "day" in age_str:
-            m = re.search(r'(\d+)', age_str)
-            if m:
-                return now - timedelta(days=int(m.group(1)))
+            return now - timedelta(days=int(m.group(1)))
         elif "week" in age_str:
-            m = re.search(r'(\d+)', age_str)
-            if m:
-                return now - timedelta(weeks=int(m.group(1)))
+            return now - timedelta(weeks=int(m.group(1)))
     except Exception:
         pass
     
@@ -197,28 +300,10 @@ def parse_brave_age(age_str: str) -> datetime:
 def tag_story(title: str, snippet: str, event_weights: Dict) -> List[str]:
     """Apply event tags based on headline + snippet keywords."""
     text = f"{title} {snippet}".lower()
-    tags = []
-    
-    # Keyword patterns for each event type
-    patterns = {
-        "guidance": ["raises guidance", "cuts outlook", "lowers guidance", "raises outlook", "guidance"],
-        "sec_filing": ["8-k", "10-k", "10-q", "sec filing", "files with sec", "sec charges"],
-        "earnings": ["earnings", "beats estimates", "misses estimates", "eps", "revenue"],
-        "m_and_a_confirmed": ["acquires", "merger completed", "deal closed", "to acquire", "acquisition"],
-        "m_and_a_rumor": ["in talks", "considering sale", "exploring options", "potential deal"],
-        "regulatory_action": ["doj", "ftc", "export controls", "antitrust", "fine", "settlement with regulators"],
-        "probe_or_investigation": ["under investigation", "probe", "investigation launched", "subpoena"],
-        "lawsuit": ["lawsuit", "sued", "class action", "settlement"],
-        "contract_win": ["wins contract", "secures deal", "awarded contract", "partnership with"],
-        "product_launch_major": ["launches", "new product", "unveils"],
-        "analyst_change_major": ["upgraded", "downgraded", "price target raised", "price target cut", "initiates coverage"],
-        "analyst_reiterate": ["reiterates", "maintains rating", "maintains buy", "maintains hold"],
-        "macro": ["fed", "interest rate", "inflation", "gdp", "unemployment", "fomc"],
-    }
-    
-    for tag, keywords in patterns.items():
-        if any(kw in text for kw in keywords):
-            tags.append(tag)
+    found = set()
+    for kw in set(_TAG_KEYWORD_RE.findall(text)):
+        found |= _TAGS_BY_KEYWORD[kw]
+    tags = [tag for tag in EVENT_TAG_KEYWORDS if tag in found]
     
     if not tags:
         tags.append("other")
@@ -255,23 +340,24 @@ def score_story(
     
     # Event score
     max_event = 20  # default "other"
-    tag_weights = []
+    top_weight = 0
+    total_weight = 0
     for tag in event_tags:
         w = event_weights.get(tag, 20)
-        tag_weights.append((tag, w))
-        if w > max_event:
-            max_event = w
-    
-    # Bonus for additional tags (capped)
-    other_tags_sum = sum(w for _, w in sorted(tag_weights, key=lambda x: -x[1])[1:])
+        total_weight += w
+        if w > top_weight:
+            top_weight = w
+    if top_weight > max_event:
+        max_event = top_weight
+    
+    # Bonus for additional tags (capped): every tag weight except the highest
+    other_tags_sum = total_weight - top_weight
     other_tags_capped = min(60, other_tags_sum)
     event_score = max_event + 0.15 * other_tags_capped
     
     # Freshness
     now = datetime.now(timezone.utc)
     published = story.get("published_at", now)
-    if isinstance(published, str):
-        published = datetime.fromisoformat(published.replace('Z', '+00:00'))
     
     minutes_ago = (now - published).total_seconds() / 60
     half_life = freshness_config.get("half_life_minutes", 720)
@@ -315,44 +401,68 @@ def score_story(
     return final_score, why
 
 
+def fetch_ticker_news(tickers: List[Dict], debug: Dict) -> Dict[str, List[Dict]]:
+    """
+    Run the Brave queries for every enabled ticker concurrently.
+
+    Requests overlap on the network but still respect http_util.BRAVE_MAX_RPS.
+    Returns raw results grouped by ticker symbol.
+    """
+    queries = [
+        (ticker["symbol"], query)
+        for ticker in tickers
+        if ticker.get("enabled", True) and ticker.get("symbol")
+        for query in (f"{ticker['symbol']} stock news", f"{ticker['symbol']} company news")
+    ]
+    
+    with ThreadPoolExecutor(max_workers=BRAVE_WORKERS) as pool:
+        responses = pool.map(lambda q: fetch_brave_news(q[1], count=10), queries)
+        raw_by_symbol = defaultdict(list)
+        for (symbol, _), results in zip(queries, responses):
+            raw_by_symbol[symbol].extend(results)
+            debug["total_candidates"] += len(results)
+    
+    return raw_by_symbol
+
+
 def process_ticker(
     ticker: Dict,
+    raw_results: List[Dict],
     ranker_config: Dict,
-    seen_state: Dict,
+    seen_urls: Set[str],
     report_date: str,
     debug: Dict
 ) -> Optional[Dict]:
-    """Process a single ticker and return its stories."""
+    """Process a single ticker's fetched results and return its stories."""
     symbol = ticker.get("symbol", "")
     if not ticker.get("enabled", True):
         return None
     
     print(f"[STOCK_NEWS] Processing {symbol}...")
     
-    # Fetch news via Brave Search
-    queries = [f"{symbol} stock news", f"{symbol} company news"]
-    raw_results = []
-    for query in queries:
-        results = fetch_brave_news(query, count=10)
-        raw_results.extend(results)
-        debug["total_candidates"] += len(results)
-    
     if not raw_results:
         return None
     
     # Config values
-    strip_params = ranker_config.get("dedupe", {}).get("strip_query_params", [])
+    strip_params = tuple(ranker_config.get("dedupe", {}).get("strip_query_params", []))
     freshness_config = ranker_config.get("freshness", {})
+    tier_by_source = {k: v.get("tier", 3) for k, v in ranker_config.get("sources", {}).items()}
+    event_weights = ranker_config.get("event_weights", {})
+    
+    # Quiet ticker: if every result was already reported, Fresh-Only would
+    # drop all of them, so skip clustering and scoring entirely
+    canonicals = {
+        canonicalize_url(r["url"], strip_params)
+        for r in raw_results
+        if r.get("url") and r.get("title")
+    }
+    if canonicals <= seen_urls:
+        debug["removed_fresh_only"] += len(canonicals)
+        print(f"[STOCK_NEWS] {symbol}: all stories filtered by Fresh-Only")
+        return None
     
     # Normalize and cluster
-    clusters = defaultdict(lambda: {
-        "titles": [],
-        "urls": [],
-        "sources": set(),
-        "earliest": None,
-        "best_url": None,
-        "title": ""
-    })
+    clusters: Dict[Tuple[str, str], Dict] = {}
     
     for r in raw_results:
         if not r.get("url") or not r.get("title"):
@@ -362,44 +472,55 @@ def process_ticker(
         canonical = canonicalize_url(r["url"], strip_params)
         
         # Normalize title for dedupe
-        norm_title = re.sub(r'[^\w\s]', '', r["title"].lower())
-        norm_title = re.sub(r'\s+', ' ', norm_title).strip()
+        norm_title = _NON_WORD_RE.sub('', r["title"].lower())
+        norm_title = _WS_RE.sub(' ', norm_title).strip()
         
         # Use domain + normalized title as cluster key
-        cluster_key = f"{source_key}:{norm_title[:50]}"
+        cluster_key = (source_key, norm_title[:50])
         
         published = parse_brave_age(r.get("published", ""))
         
-        clusters[cluster_key]["titles"].append(r["title"])
-        clusters[cluster_key]["urls"].append((canonical, r["url"]))
-        clusters[cluster_key]["sources"].add(source_key)
-        clusters[cluster_key]["title"] = r["title"]
+        # Event tagging from the full headline + description of each result
+        tags = tag_story(r["title"], r.get("description", ""), event_weights)
+        
+        c = clusters.get(cluster_key)
+        if c is None:
+            c = clusters[cluster_key] = {
+                "titles": [],
+                "urls": [],
+                "sources": set(),
+                "tags": set(),
+                "earliest": published,
+                "title": "",
+            }
+        elif published < c["earliest"]:
+            c["earliest"] = published
         
-        if clusters[cluster_key]["earliest"] is None or published < clusters[cluster_key]["earliest"]:
-            clusters[cluster_key]["earliest"] = published
+        c["titles"].append(r["title"])
+        c["urls"].append((canonical, r["url"]))
+        c["sources"].add(source_key)
+        c["tags"].update(tags)
+        c["title"] = r["title"]
     
     # Build final story list from clusters
     stories = []
     for key, cluster in clusters.items():
         # Pick best URL (prefer tier 1 sources, else shortest canonical)
-        tier = ranker_config.get("sources", {}).get(list(cluster["sources"])[0] if cluster["sources"] else "unknown", {}).get("tier", 3)
         best_url = cluster["urls"][0][1]  # Default to first
         for canonical, original in cluster["urls"]:
-            this_source = map_domain_to_source(original)
-            this_tier = ranker_config.get("sources", {}).get(this_source, {}).get("tier", 3)
+            this_tier = tier_by_source.get(map_domain_to_source(original), 3)
             if this_tier == 1:
                 best_url = original
                 break
         
-        # Event tagging
-        snippet = ""
-        tags = tag_story(cluster["title"], snippet, ranker_config.get("event_weights", {}))
+        # Union of member tags, in tag priority order ("other" only if nothing else)
+        tags = [tag for tag in EVENT_TAG_KEYWORDS if tag in cluster["tags"]] or ["other"]
         
         stories.append({
             "title": cluster["title"],
             "url": best_url,
             "canonical_url": cluster["urls"][0][0],  # First canonical for freshness check
-            "published_at": cluster["earliest"].isoformat() if cluster["earliest"] else datetime.now(timezone.utc).isoformat(),
+            "published_at": cluster["earliest"],  # datetime; serialized on output
             "sources": list(cluster["sources"]),
             "unique_sources": len(cluster["sources"]),
             "tags": tags,
@@ -410,11 +531,6 @@ def process_ticker(
     exclude_count = fresh_only_config.get("exclude_if_seen_in_last_reports", 1)
     
     fresh_stories = []
-    seen_urls = set()
-    for date_key, date_data in seen_state.items():
-        if isinstance(date_data, dict):
-            seen_urls.update(date_data.get("urls", []))
-    
     for s in stories:
         if s["canonical_url"] not in seen_urls:
             fresh_stories.append(s)
@@ -449,18 +565,17 @@ def process_ticker(
     max_glance = thresholds.get("max_glance", 3)
     
     top_stories = []
+    top_primary_tags: Set[str] = set()
     glance_stories = []
     included_urls = []
     
     for s in scored:
-        if s["score"] >= must_include:
-            top_stories.append(s)
-            included_urls.append(s["canonical_url"])
-        elif s["score"] >= top_min and len(top_stories) < max_top:
+        if s["score"] >= must_include or (s["score"] >= top_min and len(top_stories) < max_top):
             top_stories.append(s)
+            top_primary_tags.add(s["tags"][0] if s["tags"] else "")
             included_urls.append(s["canonical_url"])
         elif glance_range[0] <= s["score"] <= glance_range[1] and len(glance_stories) < max_glance:
-            if s["tags"] and s["tags"][0] not in {t["tags"][0] if t["tags"] else "" for t in top_stories}:
+            if s["tags"] and s["tags"][0] not in top_primary_tags:
                 glance_stories.append(s)
                 included_urls.append(s["canonical_url"])
     
@@ -477,7 +592,7 @@ def process_ticker(
                 "headline": s["title"],
                 "source": s["sources"][0] if s["sources"] else "unknown",
                 "url": s["url"],
-                "published_at": s["published_at"],
+                "published_at": s["published_at"].isoformat(),
                 "why_ranked": s["why_ranked"],
             }
             for s in top_stories
@@ -528,8 +643,9 @@ def get_stock_news_section(
     with open(ranker_path) as f:
         ranker_config = yaml.safe_load(f)
     
-    # Load seen state
+    # Load seen state (membership set is shared by every ticker)
     seen_state = load_seen_state()
+    seen_urls = seen_url_index(seen_state)
     
     # Debug tracking
     debug = {
@@ -545,9 +661,13 @@ def get_stock_news_section(
     results = []
     all_included_urls = []
     
+    # Fetch all tickers' news up front; scoring below is CPU-cheap
+    raw_by_symbol = fetch_ticker_news(tickers, debug)
+    
     for ticker in tickers:
         try:
-            result = process_ticker(ticker, ranker_config, seen_state, report_date, debug)
+            raw_results = raw_by_symbol.get(ticker.get("symbol", ""), [])
+            result = process_ticker(ticker, raw_results, ranker_config, seen_urls, report_date, debug)
             if result:
                 ticker_data, urls = result
                 results.append(ticker_data)
@@ -597,7 +717,41 @@ def get_portfolio_news() -> Dict:
     )
 
 
+def _check_tagging() -> int:
+    """
+    Cross-check tag_story against a plain per-tag substring scan.
+
+    Covers every keyword pair joined with a space and every pair that
+    overlaps (one keyword starting inside another, e.g. "potential deal
+    closed"), the case a non-overlapping regex scan gets wrong.
+    Returns the number of mismatches.
+    """
+    def reference(text: str) -> List[str]:
+        return [
+            tag for tag, keywords in EVENT_TAG_KEYWORDS.items()
+            if any(kw in text for kw in keywords)
+        ] or ["other"]
+
+    texts = ["potential deal closed after weeks of talks", "secures deal closed"]
+    for a in _TAG_KEYWORDS:
+        for b in _TAG_KEYWORDS:
+            texts.append(f"{a} {b}")
+            texts.extend(a + b[k:] for k in range(1, min(len(a), len(b))) if a.endswith(b[:k]))
+
+    mismatches = 0
+    for text in texts:
+        expected, got = reference(text), tag_story(text, "", {})
+        if got != expected:
+            mismatches += 1
+            print(f"[CHECK] {text!r}: expected {expected}, got {got}")
+    print(f"[CHECK] tag_story: {len(texts)} phrases, {mismatches} mismatch(es)")
+    return mismatches
+
+
 if __name__ == "__main__":
+    if "--check-tags" in sys.argv:
+        sys.exit(1 if _check_tagging() else 0)
+    
     # Test run
     result = get_portfolio_news()
     print(json.dumps(result, indent=2))
@@ -6,13 +6,35 @@ Fetches outstanding tasks + recently completed tasks from Sean's Todoist account
 Returns formatted section dict ready for JSON serialization
 """
 
-import re
-import subprocess
 import os
+import re
 import json
+import socket
 import urllib.request
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+TODOIST_TASKS_API = "https://api.todoist.com/rest/v2/tasks"
+SECRETS_ENV = os.path.expanduser("~/.openclaw/secrets.env")
+
+# Todoist onboarding/template tasks to hide from the report
+_TUTORIAL_KEYWORDS = (
+    "getting started with todoist",
+    "all about tasks",
+    "get todoist for desktop",
+    "viewing tasks",
+    "capture: add your first task",
+    "clarify: review your",
+    "set aside 5 minutes",
+    "connect your calendar",
+    "complete: check off tasks",
+    "organize with projects",
+    "add sections",
+    "discover layouts",
+    "turn any email",
+    "receive monthly todoist",
+)
+_TUTORIAL_RE = re.compile("|".join(re.escape(k) for k in _TUTORIAL_KEYWORDS))
 
 def get_tasks() -> Dict:
     """
@@ -28,70 +50,59 @@ def get_tasks() -> Dict:
     """
     
     try:
-        # Fetch active tasks
-        # TODOIST_API_KEY is already injected by systemd, no need to source
-        todoist_script = os.path.expanduser("~/.openclaw/workspace/skills/todoist/todoist.py")
-        result = subprocess.run(
-            ["python3", todoist_script, "list-tasks"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            env=os.environ.copy()
-        )
-        
-        if result.returncode != 0:
+        # Fetch active tasks straight from the REST API (no subprocess)
+        # TODOIST_API_KEY is normally injected by systemd; fall back to the
+        # secrets file when the skill is run by hand
+        api_key = os.environ.get("TODOIST_API_KEY")
+        if not api_key:
+            _load_secrets_env()
+            api_key = os.environ.get("TODOIST_API_KEY")
+        if not api_key:
             return {
                 "title": "To Do List",
-                "summary": f"Error fetching tasks: {result.stderr}",
+                "summary": "Error fetching tasks: TODOIST_API_KEY not set",
                 "items": [],
                 "meta": {
                     "source": "Todoist",
-                    "error": result.stderr[:200]
+                    "error": "TODOIST_API_KEY not set"
                 }
             }
         
-        # Parse human-readable output
-        lines = result.stdout.strip().split('\n')
+        req = urllib.request.Request(
+            TODOIST_TASKS_API,
+            headers={"Authorization": f"Bearer {api_key}"}
+        )
+        with urllib.request.urlopen(req, timeout=10) as r:
+            tasks = json.loads(r.read())
         
         # Also try to fetch recently completed tasks (use Python to directly query API)
         completed_items = _fetch_completed_tasks()
         
-        # Extract task count from first line (will be adjusted after filtering)
-        first_line = lines[0] if lines else ""
-        match = re.search(r'(\d+)\s+task', first_line)
-        _raw_count = int(match.group(1)) if match else 0
-        
-        # Parse each task line (format: [ID] Title... due: DATE)
         items = []
         overdue_count = 0
         
-        for line in lines[1:]:
-            if not line.strip():
+        for task in tasks:
+            task_id = task["id"]
+            content = task["content"].strip()
+            due = task.get("due") or {}
+            due_date = due.get("string") or "No due date"
+            
+            # Skip tutorial/template tasks
+            if _is_tutorial_task(content):
                 continue
             
-            # Parse task line: [ID] Content ... due: DATE
-            task_match = re.match(r'\[([^\]]+)\]\s+(.+?)(?:\s+due:\s+([^\n]+))?$', line)
-            if task_match:
-                task_id = task_match.group(1)
-                content = task_match.group(2).strip()
-                due_date = task_match.group(3) if task_match.group(3) else "No due date"
-                
-                # Skip tutorial/template tasks
-                if _is_tutorial_task(content):
-                    continue
-                
-                # Check if overdue (simple heuristic: if due date is in the past)
-                is_overdue = _is_overdue(due_date)
-                if is_overdue:
-                    overdue_count += 1
-                
-                item = {
-                    "id": task_id,
-                    "content": content,
-                    "due": due_date,
-                    "overdue": is_overdue
-                }
-                items.append(item)
+            # Overdue if the ISO due date is before today
+            is_overdue = _is_overdue(due.get("date"))
+            if is_overdue:
+                overdue_count += 1
+            
+            item = {
+                "id": task_id,
+                "content": content,
+                "due": due_date,
+                "overdue": is_overdue
+            }
+            items.append(item)
         
         # Build summary (use actual item count after filtering tutorials)
         total_count = len(items)
@@ -121,17 +132,19 @@ def get_tasks() -> Dict:
             }
         }
     
-    except subprocess.TimeoutExpired:
-        return {
-            "title": "To Do List",
-            "summary": "Todoist fetch timed out",
-            "items": [],
-            "meta": {
-                "source": "Todoist",
-                "error": "timeout"
-            }
-        }
     except Exception as e:
+        # Read timeouts raise socket.timeout directly; connect timeouts arrive
+        # wrapped as URLError(reason=timeout)
+        if isinstance(getattr(e, "reason", e), (socket.timeout, TimeoutError)):
+            return {
+                "title": "To Do List",
+                "summary": "Todoist fetch timed out",
+                "items": [],
+                "meta": {
+                    "source": "Todoist",
+                    "error": "timeout"
+                }
+            }
         return {
             "title": "To Do List",
             "summary": f"Failed to fetch tasks: {str(e)}",
@@ -142,12 +155,22 @@ def get_tasks() -> Dict:
             }
         }
 
-def _is_overdue(due_str: str) -> bool:
-    """Check if a due date string indicates an overdue task"""
-    if "Feb 14" in due_str or "Feb 15" in due_str:
-        # These dates are in the past (current date is Feb 23, 2026)
-        return True
-    return False
+def _load_secrets_env():
+    """Copy KEY=VALUE lines from the OpenClaw secrets file into os.environ (existing vars win)"""
+    try:
+        with open(SECRETS_ENV) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.removeprefix("export ").split("=", 1)
+                os.environ.setdefault(key.strip(), value.strip().strip('"\''))
+    except OSError:
+        pass
+
+def _is_overdue(due_iso: Optional[str]) -> bool:
+    """Check if an ISO due date (YYYY-MM-DD, optionally with time) is in the past"""
+    return bool(due_iso and date.fromisoformat(due_iso[:10]) < date.today())
 
 def _fetch_completed_tasks() -> List[Dict]:
     """Fetch tasks completed in the last 24 hours using Todoist REST API v1"""
@@ -165,24 +188,7 @@ def _fetch_completed_tasks() -> List[Dict]:
 
 def _is_tutorial_task(content: str) -> bool:
     """Filter out Todoist tutorial/template tasks"""
-    tutorial_keywords = [
-        "getting started with todoist",
-        "all about tasks",
-        "get todoist for desktop",
-        "viewing tasks",
-        "capture: add your first task",
-        "clarify: review your",
-        "set aside 5 minutes",
-        "connect your calendar",
-        "complete: check off tasks",
-        "organize with projects",
-        "add sections",
-        "discover layouts",
-        "turn any email",
-        "receive monthly todoist",
-    ]
-    content_lower = content.lower()
-    return any(keyword in content_lower for keyword in tutorial_keywords)
+    return bool(_TUTORIAL_RE.search(content.lower()))
 
 if __name__ == "__main__":
     import json
@@ -12,9 +12,35 @@ import sys
 from pathlib import Path
 from datetime import datetime, timezone
 
-REPORT_DIR = Path("/home/alfred/repos/The-Alfred-Report/public/alfred-report")
+# Add scripts dir to path
+sys.path.insert(0, str(Path(__file__).parent))
+from youtube_skill import digest_video_ids
+
+try:
+    import ijson  # optional: count items without parsing the whole report
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # optional: faster report parsing
+except ImportError:
+    orjson = None
+
+REPO_DIR = Path("/home/alfred/repos/The-Alfred-Report")
+REPORT_DIR = REPO_DIR / "public" / "alfred-report"
+PUBLISH_SCRIPT = REPO_DIR / "scripts" / "run_daily_publish.sh"
+DIGEST_DIR = Path("/home/alfred/.openclaw/workspace/skills/youtube-digest")
+DIGEST_STATE = DIGEST_DIR / "state" / "digest_state.json"
 LATEST_JSON = REPORT_DIR / "latest.json"
-SECTIONS_TO_CHECK = ["weather", "todoist", "kanban", "youtube"]
+
+# (section key, label, issue when empty, icon when meta.error is set, OK detail; {n} = item count)
+SECTION_CHECKS = [
+    ("weather", "Weather", "❌ Weather: missing or empty", "⚠️", "OK"),
+    ("todoist", "Todoist", "⚠️ Todoist: empty (may be normal if no tasks)", "❌", "{n} task(s)"),
+    ("kanban", "Kanban", "⚠️ Kanban: empty", "❌", "{n} status group(s)"),
+    ("youtube", "YouTube", "⚠️ YouTube: no videos (will retry digest)", "❌", "{n} video(s)"),
+]
+SECTIONS_TO_CHECK = [key for key, *_ in SECTION_CHECKS]
 
 def load_latest_report():
     """Load the latest report JSON"""
@@ -22,8 +48,22 @@ def load_latest_report():
         print("❌ No latest.json found")
         return None
     
-    with open(LATEST_JSON) as f:
-        return json.load(f)
+    raw = LATEST_JSON.read_bytes()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def count_youtube_items():
+    """Count YouTube items in latest.json (streamed when ijson is installed)"""
+    with open(LATEST_JSON, "rb") as f:
+        if ijson is not None:
+            return sum(1 for _ in ijson.items(f, "sections.youtube.items.item"))
+        raw = f.read()
+    report = orjson.loads(raw) if orjson else json.loads(raw)
+    return len(report.get("sections", {}).get("youtube", {}).get("items", []))
+
+def _section_error(section):
+    """Return the section's meta.error, if any"""
+    meta = section.get("meta")
+    return meta.get("error") if meta else None
 
 def check_sections(report):
     """Check critical sections for errors/completeness"""
@@ -34,44 +74,20 @@ def check_sections(report):
     issues = []
     sections = report["sections"]
     
-    # Weather
-    if "weather" not in sections or not sections["weather"].get("items"):
-        issues.append("❌ Weather: missing or empty")
-    elif sections["weather"].get("meta", {}).get("error"):
-        issues.append(f"⚠️ Weather: {sections['weather']['meta']['error']}")
-    else:
-        print("✅ Weather: OK")
-    
-    # Todoist
-    if "todoist" not in sections or not sections["todoist"].get("items"):
-        issues.append("⚠️ Todoist: empty (may be normal if no tasks)")
-    elif sections["todoist"].get("meta", {}).get("error"):
-        issues.append(f"❌ Todoist: {sections['todoist']['meta']['error']}")
-    else:
-        print(f"✅ Todoist: {len(sections['todoist']['items'])} task(s)")
-    
-    # Kanban (Alfred build out)
-    if "kanban" not in sections or not sections["kanban"].get("items"):
-        issues.append("⚠️ Kanban: empty")
-    elif sections["kanban"].get("meta", {}).get("error"):
-        issues.append(f"❌ Kanban: {sections['kanban']['meta']['error']}")
-    else:
-        print(f"✅ Kanban: {len(sections['kanban']['items'])} status group(s)")
-    
-    # YouTube
-    youtube_empty = (
-        "youtube" not in sections or 
-        not sections["youtube"].get("items") or
-        len(sections["youtube"]["items"]) == 0
-    )
-    
-    if youtube_empty:
-        issues.append("⚠️ YouTube: no videos (will retry digest)")
-        return "youtube_retry"
-    elif sections["youtube"].get("meta", {}).get("error"):
-        issues.append(f"❌ YouTube: {sections['youtube']['meta']['error']}")
-    else:
-        print(f"✅ YouTube: {len(sections['youtube']['items'])} video(s)")
+    for key, label, empty_issue, error_icon, ok_detail in SECTION_CHECKS:
+        section = sections.get(key) or {}
+        items = section.get("items")
+        if not items:
+            issues.append(empty_issue)
+            if key == "youtube":
+                return "youtube_retry"
+            continue
+        
+        error = _section_error(section)
+        if error:
+            issues.append(f"{error_icon} {label}: {error}")
+        else:
+            print(f"✅ {label}: {ok_detail.format(n=len(items))}")
     
     if issues:
         for issue in issues:
@@ -83,20 +99,24 @@ def check_sections(report):
 def retry_youtube_digest():
     """Re-run YouTube digest if it's empty"""
     print("\n[BACKUP] Running YouTube digest...")
+    before_ids = digest_video_ids(str(DIGEST_STATE))
+    # cwd is kept because digest.py may resolve paths relative to it; that
+    # rules out posix_spawn, so this launch still goes through fork+exec
     result = subprocess.run(
-        ["python3", "digest.py"],
-        cwd="/home/alfred/.openclaw/workspace/skills/youtube-digest",
-        capture_output=True,
-        text=True,
+        [sys.executable, str(DIGEST_DIR / "digest.py")],
+        cwd=DIGEST_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
         timeout=120
     )
     
-    if result.returncode == 0:
-        # Extract video count from output
-        for line in result.stdout.split('\n'):
-            if 'Done — added' in line:
-                print(f"[BACKUP] {line.strip()}")
-                return True
+    # The digest records every video it adds in its state file, so diff the
+    # ID sets rather than scraping its human-readable output (a count diff
+    # would hide additions if the digest also pruned old entries)
+    added = len(digest_video_ids(str(DIGEST_STATE)) - before_ids)
+    if result.returncode == 0 and added > 0:
+        print(f"[BACKUP] Done — added {added} video(s)")
+        return True
     
     print(f"[BACKUP] Digest finished (no new videos or already run)")
     return False
@@ -106,9 +126,11 @@ def regenerate_report():
     print("\n[BACKUP] Regenerating Alfred Report...")
     env = dict(os.environ)
     env["FORCE_REGENERATE"] = "true"
+    # The script cd's into the repo itself, so no cwd is needed; with an absolute
+    # executable and close_fds=False, subprocess can launch it via posix_spawn
     result = subprocess.run(
-        ["bash", "scripts/run_daily_publish.sh"],
-        cwd="/home/alfred/repos/The-Alfred-Report",
+        ["/bin/bash", str(PUBLISH_SCRIPT)],
+        close_fds=False,
         capture_output=True,
         text=True,
         timeout=300,
@@ -144,8 +166,7 @@ def main():
         # Regenerate report
         if regenerate_report():
             # Verify
-            report = load_latest_report()
-            youtube_count = len(report.get("sections", {}).get("youtube", {}).get("items", []))
+            youtube_count = count_youtube_items()
             print(f"\n✅ Report updated with {youtube_count} video(s)")
             return 0
         else:
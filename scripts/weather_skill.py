@@ -7,9 +7,29 @@ Returns formatted section dict ready for JSON serialization
 """
 
 import json
+import sys
 from datetime import datetime
+from pathlib import Path
 from typing import Dict
 
+# Add scripts dir to path
+sys.path.insert(0, str(Path(__file__).parent))
+import http_util
+from cache_util import get_cached_ttl, save_cache_ttl
+
+NWS_API = "https://api.weather.gov"
+UA = {"User-Agent": "alfred-ai-assistant", "Accept": "application/geo+json"}
+
+# NWS gridpoint for Arlington, VA (38.875716, -77.107999), as returned by
+# /points/{lat},{lon} — Baltimore/Sterling office. Hardcoded because that
+# lookup sometimes returns a null forecast URL and the grid never moves.
+# TODO: re-run the /points lookup if the report location ever changes.
+NWS_OFFICE = "LWX"
+NWS_GRID_X, NWS_GRID_Y = 98, 71
+
+# NWS refreshes gridpoint forecasts roughly hourly
+FORECAST_CACHE_TTL_SECONDS = 1800
+
 def get_forecast(location: str = "22207") -> Dict:
     """
     Fetch weather forecast for Arlington, VA (22207)
@@ -23,36 +43,15 @@ def get_forecast(location: str = "22207") -> Dict:
     }
     """
     
-    import urllib.request
-    import urllib.error
-    
-    # Arlington, VA coordinates
-    lat, lon = 38.875716, -77.107999
-    
     try:
-        # Step 1: Get gridpoint info
-        points_url = f"https://api.weather.gov/points/{lat},{lon}"
-        req = urllib.request.Request(
-            points_url,
-            headers={"User-Agent": "alfred-ai-assistant"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as response:
-            points_data = json.loads(response.read().decode())
-        
-        # Step 2: Get forecast from gridpoint (extract from properties.forecast)
-        # Note: API sometimes returns null, so we construct the URL directly
-        office = "LWX"  # Baltimore/Sterling office
-        grid_x, grid_y = 98, 71
-        forecast_url = f"https://api.weather.gov/gridpoints/{office}/{grid_x},{grid_y}/forecast"
-        
-        req = urllib.request.Request(
-            forecast_url,
-            headers={"User-Agent": "alfred-ai-assistant"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as response:
-            forecast_data = json.loads(response.read().decode())
-        
-        periods = forecast_data.get("properties", {}).get("periods", [])
+        cache_key = f"nws_forecast_{NWS_OFFICE}_{NWS_GRID_X}_{NWS_GRID_Y}"
+        periods = get_cached_ttl(cache_key)
+        if periods is None:
+            forecast_url = f"{NWS_API}/gridpoints/{NWS_OFFICE}/{NWS_GRID_X},{NWS_GRID_Y}/forecast"
+            forecast_data = http_util.get_json(forecast_url, headers=UA, timeout=10)
+            periods = forecast_data.get("properties", {}).get("periods", [])
+            if periods:
+                save_cache_ttl(cache_key, periods, FORECAST_CACHE_TTL_SECONDS)
         
         # Collect today + next 2 days (up to 6 periods: today afternoon/night, next day day/night, next day day/night)
         items = []
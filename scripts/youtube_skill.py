@@ -3,31 +3,143 @@
 YouTube AI Daily Digest Skill for The Alfred Report
 
 Reads today's video IDs from the digest state file,
-fetches full details via YouTube Data API (OAuth),
+fetches full details via YouTube Data API (OAuth), falling back
+to keyless oEmbed lookups when the API is unavailable,
 and returns a formatted section dict for the report.
 """
 
 import json
 import os
+import sys
+import time
 import urllib.request
 import urllib.parse
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Add scripts dir to path
+sys.path.insert(0, str(Path(__file__).parent))
+import http_util
+
+try:
+    import ijson  # optional: stream large state files instead of loading them whole
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # optional: faster state file parsing
+except ImportError:
+    orjson = None
 
 YOUTUBE_API    = "https://www.googleapis.com/youtube/v3"
 TOKEN_ENDPOINT = "https://oauth2.googleapis.com/token"
+OEMBED_API     = "https://www.youtube.com/oembed"
 STATE_FILE     = os.path.expanduser(
     "~/.openclaw/workspace/skills/youtube-digest/state/digest_state.json"
 )
+TOKEN_CACHE_FILE = os.path.expanduser("~/.cache/alfred/youtube_token.json")
+
+# Refresh the cached access token this many seconds before it actually expires
+TOKEN_EXPIRY_MARGIN = 60
+
+# OAuth credentials for the Data API (the primary, date-bearing path)
+OAUTH_ENV_VARS = ("YOUTUBE_CLIENT_ID", "YOUTUBE_CLIENT_SECRET", "YOUTUBE_REFRESH_TOKEN")
+
+# Keyless oEmbed fallback (one request per video) for when the Data API is
+# unavailable; it has no publish date, so those cards render without one.
+# Above this many videos, skip it and use the plain link fallback.
+OEMBED_MAX_VIDEOS = 25
+OEMBED_WORKERS    = 8
+API_BATCH_WORKERS = 4
+
+# Stream the state file with ijson (when installed) once it grows past this size
+STATE_STREAM_MIN_BYTES = 1_000_000
+
+# Today's video IDs, reused until the state file's mtime (or the date) changes
+_today_cache = {"key": None, "ids": None}
+
+
+def _iter_digest_videos(f, size: int):
+    """
+    Return (video_id, timestamp) pairs from an open digest state file.
+    Files of STATE_STREAM_MIN_BYTES or more are streamed with ijson when it
+    is installed, so the full history is never held in memory.
+    """
+    if ijson is not None and size >= STATE_STREAM_MIN_BYTES:
+        return ijson.kvitems(f, "videos")
+    raw = f.read()
+    state = orjson.loads(raw) if orjson else json.loads(raw)
+    return state.get("videos", {}).items()
+
+
+def digest_video_ids(state_file: str = STATE_FILE) -> Set[str]:
+    """Return the IDs of every video in the digest state file (empty if missing/unreadable)."""
+    try:
+        with open(state_file, "rb") as f:
+            return {vid for vid, _ in _iter_digest_videos(f, os.fstat(f.fileno()).st_size)}
+    except Exception:
+        return set()
+
+
+def _today_video_ids(today_prefix: str) -> List[str]:
+    """Return IDs of digest videos whose timestamp starts with today_prefix."""
+    st = os.stat(STATE_FILE)
+    key = (st.st_mtime, today_prefix)
+    if _today_cache["key"] != key:
+        with open(STATE_FILE, "rb") as f:
+            videos = _iter_digest_videos(f, st.st_size)
+            _today_cache["ids"] = [vid for vid, ts in videos if ts.startswith(today_prefix)]
+        _today_cache["key"] = key
+    return _today_cache["ids"]
+
+
+def _load_cached_token(client_id: str) -> str:
+    """Return the cached access token if it is still valid for this client, else ''."""
+    try:
+        with open(TOKEN_CACHE_FILE, "rb") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return ""
+    if cached.get("client_id") != client_id:
+        return ""
+    if time.time() >= cached.get("expires_at", 0) - TOKEN_EXPIRY_MARGIN:
+        return ""
+    return cached.get("access_token", "")
+
+
+def _save_cached_token(client_id: str, access_token: str, expires_in: float) -> None:
+    """Persist the access token (owner-only permissions, atomic replace)."""
+    tmp = TOKEN_CACHE_FILE + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), exist_ok=True)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({
+                "client_id":    client_id,
+                "access_token": access_token,
+                "expires_at":   time.time() + expires_in,
+            }, f)
+        os.replace(tmp, TOKEN_CACHE_FILE)
+    except OSError:
+        pass  # caching is best-effort; next run just exchanges again
 
 
 def _get_access_token() -> str:
-    """Exchange refresh token for a short-lived access token using urllib."""
+    """
+    Return an OAuth access token, reusing the cached one while it is valid.
+    Otherwise exchange the refresh token for a new one using urllib.
+    """
     client_id     = os.environ["YOUTUBE_CLIENT_ID"]
     client_secret = os.environ["YOUTUBE_CLIENT_SECRET"]
     refresh_token = os.environ["YOUTUBE_REFRESH_TOKEN"]
 
+    access_token = _load_cached_token(client_id)
+    if access_token:
+        return access_token
+
     body = urllib.parse.urlencode({
         "client_id":     client_id,
         "client_secret": client_secret,
@@ -37,7 +149,50 @@ def _get_access_token() -> str:
 
     req = urllib.request.Request(TOKEN_ENDPOINT, data=body, method="POST")
     with urllib.request.urlopen(req, timeout=15) as r:
-        return json.loads(r.read().decode())["access_token"]
+        token = json.loads(r.read())
+
+    access_token = token["access_token"]
+    _save_cached_token(client_id, access_token, token.get("expires_in", 3600))
+    return access_token
+
+
+def _fetch_one_batch(video_ids: List[str], access_token: str) -> List[Dict]:
+    """Fetch snippet details for up to 50 video IDs in one Data API request."""
+    params = urllib.parse.urlencode({
+        "part": "snippet",
+        "id":   ",".join(video_ids),
+    })
+    data = http_util.get_json(
+        f"{YOUTUBE_API}/videos?{params}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=15,
+    )
+
+    items = []
+    for video in data.get("items", []):
+        snippet   = video.get("snippet", {})
+        video_id  = video["id"]
+        thumbnails = snippet.get("thumbnails", {})
+
+        # Prefer high quality, fall back progressively
+        thumbnail_url = (
+            thumbnails.get("maxres", {}).get("url")
+            or thumbnails.get("high",   {}).get("url")
+            or thumbnails.get("medium", {}).get("url")
+            or thumbnails.get("default",{}).get("url")
+            or f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+        )
+
+        items.append({
+            "video_id":     video_id,
+            "title":        snippet.get("title", "Untitled"),
+            "channel":      snippet.get("channelTitle", "Unknown"),
+            "published_at": snippet.get("publishedAt", ""),
+            "thumbnail":    thumbnail_url,
+            "url":          f"https://www.youtube.com/watch?v={video_id}",
+        })
+
+    return items
 
 
 def _fetch_video_details(video_ids: List[str], access_token: str) -> List[Dict]:
@@ -46,45 +201,69 @@ def _fetch_video_details(video_ids: List[str], access_token: str) -> List[Dict]:
     Thumbnails are also constructable without an API call, but we pull them here
     for accuracy (maxresdefault may not exist; API returns the best available).
     """
-    # YouTube API allows up to 50 IDs per request
-    items = []
-    for i in range(0, len(video_ids), 50):
-        batch = video_ids[i:i + 50]
-        params = urllib.parse.urlencode({
-            "part": "snippet",
-            "id":   ",".join(batch),
-        })
-        req = urllib.request.Request(
-            f"{YOUTUBE_API}/videos?{params}",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        with urllib.request.urlopen(req, timeout=15) as r:
-            data = json.loads(r.read().decode())
-
-        for video in data.get("items", []):
-            snippet   = video.get("snippet", {})
-            video_id  = video["id"]
-            thumbnails = snippet.get("thumbnails", {})
-
-            # Prefer high quality, fall back progressively
-            thumbnail_url = (
-                thumbnails.get("maxres", {}).get("url")
-                or thumbnails.get("high",   {}).get("url")
-                or thumbnails.get("medium", {}).get("url")
-                or thumbnails.get("default",{}).get("url")
-                or f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-            )
-
-            items.append({
-                "video_id":     video_id,
-                "title":        snippet.get("title", "Untitled"),
-                "channel":      snippet.get("channelTitle", "Unknown"),
-                "published_at": snippet.get("publishedAt", ""),
-                "thumbnail":    thumbnail_url,
-                "url":          f"https://www.youtube.com/watch?v={video_id}",
-            })
+    # YouTube API allows up to 50 IDs per request; batches are fetched in parallel
+    batches = [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+    with ThreadPoolExecutor(max_workers=API_BATCH_WORKERS) as pool:
+        results = pool.map(lambda batch: _fetch_one_batch(batch, access_token), batches)
+        return [item for batch_items in results for item in batch_items]
 
-    return items
+
+def _fetch_oembed_one(video_id: str) -> Optional[Dict]:
+    """Fetch title and channel for one video via oEmbed; None if unavailable."""
+    params = urllib.parse.urlencode({
+        "url":    f"https://www.youtube.com/watch?v={video_id}",
+        "format": "json",
+    })
+    try:
+        data = http_util.get_json(f"{OEMBED_API}?{params}", timeout=5)
+    except Exception:
+        return None
+
+    return {
+        "video_id":     video_id,
+        "title":        data.get("title", "Untitled"),
+        "channel":      data.get("author_name", "Unknown"),
+        "published_at": "",  # not exposed by oEmbed
+        "thumbnail":    data.get("thumbnail_url") or f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+        "url":          f"https://www.youtube.com/watch?v={video_id}",
+    }
+
+
+def _fetch_via_oembed(video_ids: List[str]) -> List[Dict]:
+    """
+    Fetch video details through the keyless oEmbed endpoint, in parallel.
+    Videos oEmbed can't describe get a basic link item; returns [] if none resolved.
+    """
+    with ThreadPoolExecutor(max_workers=OEMBED_WORKERS) as pool:
+        results = list(pool.map(_fetch_oembed_one, video_ids))
+
+    if not any(results):
+        return []
+    return [item or _placeholder_item(vid) for vid, item in zip(video_ids, results)]
+
+
+def _fetch_via_data_api(video_ids: List[str]) -> Tuple[List[Dict], str]:
+    """
+    Fetch full video details through the Data API.
+    Returns (videos, error); videos is [] and error says why when it fails.
+    The access token is cached, so this usually costs a single API request.
+    """
+    if not all(os.environ.get(var) for var in OAUTH_ENV_VARS):
+        return [], "YouTube OAuth credentials not set"
+
+    try:
+        access_token = _get_access_token()
+    except Exception as e:
+        return [], f"OAuth token error: {e}"
+
+    try:
+        videos = _fetch_video_details(video_ids, access_token)
+    except Exception as e:
+        return [], f"API fetch error: {e}"
+
+    if not videos:
+        return [], "No video details returned from API."
+    return videos, ""
 
 
 def get_youtube_updates() -> Dict:
@@ -92,37 +271,30 @@ def get_youtube_updates() -> Dict:
     Main entry point for The Alfred Report.
     Returns section dict with video items for today.
     """
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
     try:
         # ── Read state file ────────────────────────────────────────────────
         if not os.path.exists(STATE_FILE):
-            return _empty("No YouTube additions tracked yet.")
-
-        with open(STATE_FILE) as f:
-            state = json.load(f)
+            return _empty("No YouTube additions tracked yet.", now_iso)
 
-        today = datetime.now(timezone.utc).date()
-        today_ids = [
-            vid for vid, ts in state.get("videos", {}).items()
-            if datetime.fromisoformat(ts).date() == today
-        ]
+        # Timestamps are ISO-8601, so the leading YYYY-MM-DD is the date;
+        # comparing that prefix avoids parsing every historical entry
+        today_prefix = now.strftime("%Y-%m-%d")
+        today_ids = _today_video_ids(today_prefix)
 
         if not today_ids:
-            return _empty("No new videos added today.")
+            return _empty("No new videos added today.", now_iso)
 
-        # ── Get OAuth access token ─────────────────────────────────────────
-        try:
-            access_token = _get_access_token()
-        except Exception as e:
-            return _fallback(today_ids, f"OAuth token error: {e}")
+        # ── Data API (OAuth): titles, channels and publish dates ───────────
+        videos, error = _fetch_via_data_api(today_ids)
 
-        # ── Fetch video details ────────────────────────────────────────────
-        try:
-            videos = _fetch_video_details(today_ids, access_token)
-        except Exception as e:
-            return _fallback(today_ids, f"API fetch error: {e}")
+        # ── Keyless oEmbed fallback (no publish date) ──────────────────────
+        if not videos and len(today_ids) <= OEMBED_MAX_VIDEOS:
+            videos = _fetch_via_oembed(today_ids)
 
         if not videos:
-            return _fallback(today_ids, "No video details returned from API.")
+            return _fallback(today_ids, error, now_iso)
 
         return {
             "title":   "Today's AI Daily Digest",
@@ -130,7 +302,7 @@ def get_youtube_updates() -> Dict:
             "items":   videos,
             "meta": {
                 "source":     "AI Daily Digest Playlist",
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "updated_at": now_iso,
                 "video_count": len(videos),
             },
         }
@@ -142,45 +314,47 @@ def get_youtube_updates() -> Dict:
             "items":   [],
             "meta": {
                 "source":     "AI Daily Digest Playlist",
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "updated_at": now_iso,
                 "video_count": 0,
                 "error":      str(e)[:200],
             },
         }
 
 
-def _empty(message: str) -> Dict:
+def _empty(message: str, now_iso: str) -> Dict:
     return {
         "title":   "Today's AI Daily Digest",
         "summary": message,
         "items":   [],
         "meta": {
             "source":      "AI Daily Digest Playlist",
-            "updated_at":  datetime.now(timezone.utc).isoformat(),
+            "updated_at":  now_iso,
             "video_count": 0,
         },
     }
 
 
-def _fallback(video_ids: List[str], error: str) -> Dict:
+def _placeholder_item(video_id: str) -> Dict:
+    """Basic link item for a video whose details couldn't be fetched."""
+    return {
+        "video_id":     video_id,
+        "title":        "YouTube Video",
+        "channel":      "AI Daily Digest",
+        "published_at": "",
+        "thumbnail":    f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+        "url":          f"https://www.youtube.com/watch?v={video_id}",
+    }
+
+
+def _fallback(video_ids: List[str], error: str, now_iso: str) -> Dict:
     """Return basic link items when we can't fetch full details."""
     return {
         "title":   "Today's AI Daily Digest",
         "summary": f"{len(video_ids)} video(s) added today",
-        "items": [
-            {
-                "video_id":     vid,
-                "title":        "YouTube Video",
-                "channel":      "AI Daily Digest",
-                "published_at": "",
-                "thumbnail":    f"https://img.youtube.com/vi/{vid}/hqdefault.jpg",
-                "url":          f"https://www.youtube.com/watch?v={vid}",
-            }
-            for vid in video_ids
-        ],
+        "items": [_placeholder_item(vid) for vid in video_ids],
         "meta": {
             "source":      "AI Daily Digest Playlist",
-            "updated_at":  datetime.now(timezone.utc).isoformat(),
+            "updated_at":  now_iso,
             "video_count": len(video_ids),
             "error":       error,
         },